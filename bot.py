@@ -1,113 +1,84 @@
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ConversationHandler
 from telegram import Update
+from typing import Optional
+import asyncio
 import datetime
-import os, codecs
 from config.config import BotConfig
 from modules.student_data_service import StudentDataService, StudentProgress
 from modules.gpt_service import GPTService
 from modules.logger import BotLogger
+from modules.prompt_registry import PromptRegistry
+from modules.shared_resources import SharedResources, http_pool_size
+from models.database import DB_POOL_SIZE, DB_MAX_OVERFLOW
+from modules.update_processor import PerChatUpdateProcessor
 from services.database_service import DatabaseService
+from services.persistence_service import DatabasePersistence
 
 # Состояния диалога
 WAITING_EMAIL = 1
 
 class TelegramBot:
-    def __init__(self, config: BotConfig):
+    def __init__(self, config: BotConfig, shared: Optional[SharedResources] = None):
         # Инициализация логгера
-        self.logger = BotLogger(config.log_directory)
+        self.logger = BotLogger(config.log_directory, name=config.name if shared else None)
         self.logger.log_bot_startup(config.__dict__)
         
-        # Инициализация Telegram приложения
-        self.application = Application.builder().token(config.bot_key).build()
+        # Бот работает отдельно или вместе с другими ботами в одном процессе (см. multi_bot.py)
+        self.hosted = shared is not None
+        self.shared = shared or SharedResources(
+            http_pool_size=http_pool_size([config]),
+            db_pool_size=DB_POOL_SIZE + DB_MAX_OVERFLOW
+        )
+        
+        # Инициализация Telegram приложения с хранением состояния в базе данных
+        persistence = DatabasePersistence(
+            self.logger,
+            update_interval=config.persistence_update_interval,
+            bot_name=config.name
+        )
+        # Обновления разных чатов обрабатываются параллельно, одного чата - по очереди;
+        # запросы к GPT дополнительно ограничивает gpt_semaphore
+        builder = Application.builder()\
+            .token(config.bot_key)\
+            .persistence(persistence)\
+            .concurrent_updates(PerChatUpdateProcessor(config.concurrent_updates))
+        if self.hosted:
+            # Периодические задачи запускает общий планировщик процесса
+            builder = builder.job_queue(None)
+        self.application = builder.build()
         
         # Инициализация конфигурации
         self.config = config
         
-        #Инициализация роли бота
-        self.role = self._load_role()
+        # Роль и промпты бота, перечитываются при изменении файлов
+        self.prompts = PromptRegistry(config.role_file, config.prompts_file, self.logger)
         
         # Инициализация сервисов
-        self.student_service = StudentDataService(self.logger)
-        self.gpt_service = GPTService(config, self.logger)
-        self.db_service = DatabaseService()  #сервис базы данных
+        self.student_service = StudentDataService(
+            self.logger,
+            api_url=config.student_api_url,
+            api_key=config.student_api_key,
+            session=self.shared.http_session
+        )
+        self.gpt_service = GPTService(config, self.logger, session=self.shared.http_session)
+        self.db_service = DatabaseService(bot_name=config.name)  #сервис базы данных
+        
+        # Ограничение одновременных запросов к GPT, чтобы один бот не занимал весь общий пул
+        self.gpt_semaphore = asyncio.Semaphore(config.max_concurrent_requests)
         
         # Инициализация обработчиков
         self._setup_handlers()
         
         # Логирование успешного запуска
         self.logger.logger.info('Bot initialization completed successfully')
+
+    def run(self):
+        """Запуск бота в отдельном процессе"""
         print('Запуск бота...')
         print(f'Настроено обновление данных каждую {self.config.update_interval} минуту')
-        
-        # Запуск бота
         self.application.run_polling(1.0)
     
 
-    def _get_status_level(self, expected_result: float) -> str:
-        """Определение статуса на основе expected_result"""
-        if expected_result > 3:
-            return "Superior"
-        elif 0 <= expected_result <= 3:
-            return "On track"
-        elif -4 <= expected_result < 0:
-            return "Small Problems"
-        elif -10 <= expected_result < -4:
-            return "Problems"
-        else:  # expected_result < -10
-            return "Critical Gap"
-
-    def _generate_progress_prompt(self, expected_result: float) -> str:
-        """Генерация промпта на основе expected_result"""
-
-        status = self._get_status_level(expected_result)
-        if status == "Superior":
-            return (
-                #f"Student has Expected Result = {expected_result}. "
-                "Student has Result = Superior"
-                "They are EXCELLING! 🌟 Act extremely excited and proud! "
-                "Use phrases like 'You're absolutely crushing it!' and 'You're becoming a legend!' "
-                "Compare them to successful African tech leaders. "
-                "Your tone should be energetic and thrilled - this student is a future leader. "
-                "Push them to become a mentor for others."
-            )
-        elif status == "On track":
-            return (
-                "Student has Result = On track"
-                "They are ON TRACK! 💪 Be genuinely positive and encouraging. "
-                "Use phrases like 'Steady progress!' and 'You're building something great!' "
-                "Compare their journey to successful African startups that grew step by step. "
-                "Your tone should be warm and supportive - they're doing things right. "
-                "Encourage them to maintain this momentum."
-            )
-        elif status == "Small Problems":
-            return (
-                f"Student has Result = Small Problems. "
-                "They are FALLING BEHIND! ⚠️ Use light warning tone with friendly teasing. "
-                "Use phrases like 'Yo, what's happening?' and 'Time to wake up!' "
-                "Reference how African tech requires constant hustle and focus. "
-                "Your tone should be like a friend who notices their buddy slacking off. "
-                "Make them feel slightly uncomfortable but in a friendly way."
-            )
-        elif status == "Problems":
-            return (
-                f"Student has Expected Result = Problems. "
-                "They are BEHIND! ⛔ Show concern and urgency. "
-                "Use phrases like 'This is a serious wake-up call' and 'We need to turn this around now.' "
-                "Reference African success stories that started from difficult situations. "
-                "Your tone should be like a concerned elder sibling - mix care with tough love. "
-                "Create a sense of urgency while offering specific steps to improve."
-            )
-        else:  # status == Critical Gap
-            return (
-                f"Student has Expected Result = Critical Gap. "
-                "This is a CRITICAL SITUATION! 🚨 Show maximum concern and authority. "
-                "Use phrases like 'This stops NOW' and 'Your future cannot wait'. "
-                "Speak with the authority of an African elder who sees their child heading towards failure. "
-                "Your tone should be deeply concerned but not giving up - tough love at maximum. "
-                "Demand immediate change while expressing belief in their potential. "
-                "Make them understand this is a defining moment in their journey."
-            )
-        
     def _setup_handlers(self):
         # Обработчик диалога верификации
         conv_handler = ConversationHandler(
@@ -115,7 +86,9 @@ class TelegramBot:
             states={
                 WAITING_EMAIL: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.verify_email)]
             },
-            fallbacks=[]
+            fallbacks=[],
+            name='verification',
+            persistent=True
         )
 
         # Добавляем обработчики
@@ -124,45 +97,43 @@ class TelegramBot:
 
         # Настраиваем периодическое обновление
         job_queue = self.application.job_queue
-        job_queue.run_repeating(
-            self.periodic_update,
-            interval=datetime.timedelta(minutes=self.config.update_interval),
-            first=datetime.timedelta(seconds=10)
-        )
+        if job_queue is not None:
+            job_queue.run_repeating(
+                self.periodic_update,
+                interval=datetime.timedelta(minutes=self.config.update_interval),
+                first=datetime.timedelta(seconds=10)
+            )
+            job_queue.run_repeating(
+                self.reload_prompts,
+                interval=datetime.timedelta(seconds=self.config.prompt_reload_interval)
+            )
 
 
-    def _load_role(self) -> str:
-        """Загрузка роли бота"""
-        try:
-            role_path = os.path.join(os.getcwd(), self.config.role_file)
-            with codecs.open(role_path, 'r', encoding='utf-8') as file:
-                return file.read().strip()
-        except Exception as e:
-            print(f"Error loading role: {str(e)}")
-            return "You are a friendly African student assistant"
-    
+    async def _ask_gpt(self, messages: list) -> str:
+        """Запрос к GPT в общем пуле потоков с ограничением на число запросов от бота"""
+        async with self.gpt_semaphore:
+            return await self.shared.run_http(self.gpt_service.get_gpt_response, messages)
 
     async def start(self, update: Update, context) -> int:
         """Обработчик команды /start"""
         chat_id = update.message.chat_id
         
         # Проверяем, верифицирован ли уже этот пользователь
-        user = self.db_service.get_user_by_chat_id(chat_id)
+        user = await self.shared.run_db(self.db_service.get_user_by_chat_id, chat_id)
         if user and user.verified:
-            current_email = self.user_verified[chat_id]["email"]
             await update.message.reply_text(
-                f"You are already verified with email: {current_email}\n"
+                f"You are already verified with email: {user.email}\n"
                 "You cannot change your email once verified. If you need to change your email, please contact support."
             )
             return ConversationHandler.END
             
         try:
             messages = [
-                {"role": "system", "content": self.role},
+                {"role": "system", "content": self.prompts.current.role},
                 {"role": "user", "content": "Greet the new student and ask him to introduce himself by specifying his email address, which was used when registering for the course"}
             ]
             
-            response = self.gpt_service.get_gpt_response(messages)
+            response = await self._ask_gpt(messages)
             await update.message.reply_text(response)
         except Exception as e:
             self.logger.logger.error(f"Start command error: {str(e)}")
@@ -178,7 +149,7 @@ class TelegramBot:
         email = update.message.text.strip().lower()
         
         # Проверяем, не верифицирован ли уже этот пользователь
-        existing_user = self.db_service.get_user_by_chat_id(chat_id)
+        existing_user = await self.shared.run_db(self.db_service.get_user_by_chat_id, chat_id)
         if existing_user and existing_user.verified:
             await update.message.reply_text(
                 f"Your Telegram account is already verified with email: {existing_user.email}\n"
@@ -187,7 +158,7 @@ class TelegramBot:
             return ConversationHandler.END
 
         # Проверяем, не используется ли уже этот email
-        email_user = self.db_service.get_user_by_email(email)
+        email_user = await self.shared.run_db(self.db_service.get_user_by_email, email)
         if email_user:
             await update.message.reply_text(
                 "This email is already verified with another Telegram account.\n"
@@ -201,17 +172,18 @@ class TelegramBot:
         
         if student_data:
             # Сохраняем пользователя в базу данных
-            self.db_service.save_user(chat_id=chat_id, email=email)
+            await self.shared.run_db(self.db_service.save_user, chat_id=chat_id, email=email)
             self.logger.log_user_verification(chat_id, email, True)
             
             try:
-                status = self._get_status_level(student_data.expected_result)
-                progress_prompt = self._generate_progress_prompt(student_data.expected_result)
+                prompts = self.prompts.current
+                status = prompts.status_for(student_data.expected_result)
+                progress_prompt = prompts.progress_prompt(status)
                 messages = [
-                    {"role": "system", "content": self.role},
+                    {"role": "system", "content": prompts.role},
                     {"role": "user", "content": progress_prompt}
                 ]
-                response = self.gpt_service.get_gpt_response(messages)
+                response = await self._ask_gpt(messages)
                 
                 await update.message.reply_text(
                     f"Level check complete! ✨\n"
@@ -241,7 +213,7 @@ class TelegramBot:
         chat_id = update.message.chat_id
         
         # Проверяем верификацию пользователя через базу данных
-        user = self.db_service.get_user_by_chat_id(chat_id)
+        user = await self.shared.run_db(self.db_service.get_user_by_chat_id, chat_id)
         if not user or not user.verified:
             await update.message.reply_text(
                 "Please first introduce yourself using the /start command."
@@ -251,7 +223,8 @@ class TelegramBot:
         started = datetime.datetime.now()
 
         # Сохраняем сообщение пользователя в базу данных
-        self.db_service.save_message(
+        await self.shared.run_db(
+            self.db_service.save_message,
             chat_id=chat_id,
             message_id=update.message.message_id,
             user_id=update.message.from_user.id,
@@ -261,21 +234,22 @@ class TelegramBot:
 
         try:
             # Получаем историю сообщений из базы данных
-            history = self.db_service.get_chat_history(chat_id, self.config.tail)
+            history = await self.shared.run_db(self.db_service.get_chat_history, chat_id, self.config.tail)
             
             # Формируем сообщения для GPT
             messages = [
-                {'role': 'system', 'content': self.role}
+                {'role': 'system', 'content': self.prompts.current.role}
             ] + [
                 {'role': message.role, 'content': message.content}
                 for message in reversed(history)  # Разворачиваем историю, чтобы сообщения шли в правильном порядке
             ]
 
             # Получаем ответ от GPT
-            response = self.gpt_service.get_gpt_response(messages)
+            response = await self._ask_gpt(messages)
 
             # Сохраняем ответ бота в базу данных
-            self.db_service.save_message(
+            await self.shared.run_db(
+                self.db_service.save_message,
                 chat_id=chat_id,
                 message_id=update.message.message_id + 1,
                 user_id=None,  # для сообщений бота user_id не нужен
@@ -295,7 +269,7 @@ class TelegramBot:
         """Периодическое обновление данных"""
         try:
             self.logger.logger.info("Starting student data update...")
-            if self.student_service.update_data():
+            if await self.shared.run_http(self.student_service.update_data):
                 self.logger.logger.info("Student data updated successfully")
             else:
                 self.logger.logger.error("Failed to update student data")
@@ -303,18 +277,27 @@ class TelegramBot:
             self.logger.logger.error(f"Error during periodic update: {str(e)}", exc_info=True)
     
 
+    async def reload_prompts(self, context):
+        """Проверка файлов роли и промптов и подмена версии без перезапуска"""
+        try:
+            self.prompts.check_for_updates()
+        except Exception as e:
+            self.logger.logger.error(f"Error during prompt reload: {str(e)}", exc_info=True)
+    
+
     async def send_progress_update(self, chat_id: int, student_data: StudentProgress) -> None:
         """Отправка обновления прогресса студенту"""
         try:
             # Генерируем промпт и получаем ответ от GPT
-            status = self._get_status_level(student_data.expected_result)
-            progress_prompt = self._generate_progress_prompt(student_data.expected_result)
+            prompts = self.prompts.current
+            status = prompts.status_for(student_data.expected_result)
+            progress_prompt = prompts.progress_prompt(status)
             messages = [
-                {"role": "system", "content": self.role},
+                {"role": "system", "content": prompts.role},
                 {"role": "user", "content": f"{progress_prompt} This is an automatic progress update, make the message more personalized."}
             ]
             
-            response = self.gpt_service.get_gpt_response(messages)
+            response = await self._ask_gpt(messages)
             
             
             # Формируем сообщение
@@ -338,4 +321,5 @@ class TelegramBot:
 
 if __name__ == '__main__':
     config = BotConfig()
-    bot = TelegramBot(config)
\ No newline at end of file
+    bot = TelegramBot(config)
+    bot.run()
\ No newline at end of file
@@ -1,3 +1,3 @@
-from .config import BotConfig
+from .config import BotConfig, load_bot_configs
 
-__all__ = ['BotConfig']
\ No newline at end of file
+__all__ = ['BotConfig', 'load_bot_configs']
\ No newline at end of file
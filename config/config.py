@@ -1,23 +1,91 @@
 import os
-from dataclasses import dataclass
+import re
+import json
+from dataclasses import dataclass, fields
+from typing import List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 @dataclass
 class BotConfig:
+    name: str = 'default' #имя бота, разделяет данные ботов в общей БД
     bot_key: str = os.getenv('BOT_TOKEN')
     gpt_key: str = os.getenv('GPT_KEY')
     openai_proxy_host: str = os.getenv('OPENAI_PROXY_HOST')
 
+    student_api_url: str = "https://aumit.us/wp-json/student-progress/v1/course-data/"
+    student_api_key: Optional[str] = None #по умолчанию API студентов вызывается с токеном этого же бота
+
     tail: int = 6
     model: str = "gpt-4o-mini"
     temperature: float = 0.5
     history_file: str = 'history.csv'
     role_file: str = 'role.txt'
+    prompts_file: str = 'prompts.json' #промпты прогресса и границы статусов
+    prompt_reload_interval: int = 5 #в секундах, как часто проверять изменения role_file и prompts_file
     update_interval: int = 10 #в минутах
+    persistence_update_interval: int = 60 #в секундах, как часто сохранять состояние диалогов в БД
+    concurrent_updates: int = 16 #обновлений Telegram из разных чатов, обрабатываемых ботом одновременно
+    max_concurrent_requests: int = 4 #одновременных запросов к GPT от одного бота
     
     log_directory: str = "logs"
     log_level: str = os.getenv('LOG_LEVEL', 'INFO')
     max_log_size: int = 5 * 1024 * 1024  # 5MB
-    backup_count: int = 5
\ No newline at end of file
+    backup_count: int = 5
+
+    def __post_init__(self):
+        if self.student_api_key is None:
+            self.student_api_key = self.bot_key
+
+
+# Логирование настраивается один раз на процесс, поэтому эти поля должны совпадать у всех ботов
+PROCESS_WIDE_FIELDS = ('log_directory', 'log_level', 'max_log_size', 'backup_count')
+
+UNRESOLVED_VARIABLE = re.compile(r'\$\{?\w+\}?')
+
+def load_bot_configs(path: str) -> List[BotConfig]:
+    """Загрузка конфигураций нескольких ботов из JSON-файла.
+
+    Файл содержит список объектов с полями BotConfig; незаданные поля берутся
+    по умолчанию, строки вида ${VAR} подставляются из переменных окружения.
+    bot_key обязателен для каждого бота, чтобы боты не делили токен из BOT_TOKEN.
+    Поля PROCESS_WIDE_FIELDS общие для процесса и должны совпадать у всех ботов.
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        entries = json.load(file)
+
+    known_fields = {field.name for field in fields(BotConfig)}
+    configs = []
+    for entry in entries:
+        unknown = set(entry) - known_fields
+        if unknown:
+            raise ValueError(f"Unknown bot config fields in {path}: {', '.join(sorted(unknown))}")
+        if not entry.get('bot_key'):
+            raise ValueError(f"Bot '{entry.get('name', 'default')}' in {path} has no bot_key")
+
+        values = {}
+        for key, value in entry.items():
+            if isinstance(value, str):
+                value = os.path.expandvars(value)
+                unresolved = UNRESOLVED_VARIABLE.search(value)
+                if unresolved:
+                    raise ValueError(
+                        f"Bot '{entry.get('name', 'default')}' in {path}: "
+                        f"environment variable {unresolved.group(0)} in '{key}' is not set"
+                    )
+            values[key] = value
+        configs.append(BotConfig(**values))
+
+    for config in configs[1:]:
+        for field_name in PROCESS_WIDE_FIELDS:
+            if getattr(config, field_name) != getattr(configs[0], field_name):
+                raise ValueError(
+                    f"Bot '{config.name}' in {path}: '{field_name}' is process-wide "
+                    f"and must match the first bot ('{configs[0].name}')"
+                )
+
+    names = [config.name for config in configs]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Bot names in {path} must be unique")
+    return configs
\ No newline at end of file
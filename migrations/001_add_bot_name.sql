@@ -0,0 +1,25 @@
+-- Переход существующей БД одного бота на схему с bot_name (несколько ботов в одной БД).
+-- Выполнить один раз до запуска новой версии:
+--   psql "$DATABASE_URL" -f migrations/001_add_bot_name.sql
+-- Если таблицы persistence еще нет, ее затем создает python init_db.py.
+BEGIN;
+
+ALTER TABLE messages DROP CONSTRAINT IF EXISTS messages_chat_id_fkey;
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS bot_name VARCHAR(100) NOT NULL DEFAULT 'default';
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS bot_name VARCHAR(100) NOT NULL DEFAULT 'default';
+
+ALTER TABLE users DROP CONSTRAINT IF EXISTS users_chat_id_key;
+ALTER TABLE users DROP CONSTRAINT IF EXISTS users_email_key;
+ALTER TABLE users ADD CONSTRAINT uq_users_bot_chat_id UNIQUE (bot_name, chat_id);
+ALTER TABLE users ADD CONSTRAINT uq_users_bot_email UNIQUE (bot_name, email);
+
+ALTER TABLE messages ADD CONSTRAINT messages_bot_name_chat_id_fkey
+    FOREIGN KEY (bot_name, chat_id) REFERENCES users (bot_name, chat_id) ON DELETE CASCADE;
+
+ALTER TABLE IF EXISTS persistence ADD COLUMN IF NOT EXISTS bot_name VARCHAR(100) NOT NULL DEFAULT 'default';
+ALTER TABLE IF EXISTS persistence DROP CONSTRAINT IF EXISTS uq_persistence_kind_key;
+ALTER TABLE IF EXISTS persistence DROP CONSTRAINT IF EXISTS uq_persistence_bot_kind_key;
+ALTER TABLE IF EXISTS persistence ADD CONSTRAINT uq_persistence_bot_kind_key UNIQUE (bot_name, kind, key);
+
+COMMIT;
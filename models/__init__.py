@@ -1,4 +1,4 @@
-from .models import User, Message
+from .models import User, Message, PersistenceRecord
 from .database import init_db, get_db, Base
 
-__all__ = ['User', 'Message', 'init_db', 'get_db', 'Base']
\ No newline at end of file
+__all__ = ['User', 'Message', 'PersistenceRecord', 'init_db', 'get_db', 'Base']
\ No newline at end of file
@@ -9,8 +9,17 @@ Base = declarative_base()
 # Получаем URL базы данных из переменных окружения
 DATABASE_URL = os.getenv('DATABASE_URL')
 
+# Размер пула соединений, общего для всех ботов процесса
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+
 # Создаем движок базы данных
-engine = create_engine(DATABASE_URL)
+engine = create_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=True
+)
 
 # Создаем фабрику сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,24 +1,47 @@
-from sqlalchemy import Column, Integer, String, Boolean, BigInteger, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, BigInteger, DateTime, ForeignKeyConstraint, Text, JSON, UniqueConstraint
 from sqlalchemy.sql import func
 from .database import Base
 
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        UniqueConstraint('bot_name', 'chat_id', name='uq_users_bot_chat_id'),
+        UniqueConstraint('bot_name', 'email', name='uq_users_bot_email'),
+    )
 
     id = Column(Integer, primary_key=True)
-    chat_id = Column(BigInteger, unique=True, nullable=False)
-    email = Column(String(255), unique=True, nullable=False)
+    bot_name = Column(String(100), nullable=False, default='default', server_default='default')
+    chat_id = Column(BigInteger, nullable=False)
+    email = Column(String(255), nullable=False)
     verified = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 class Message(Base):
     __tablename__ = 'messages'
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['bot_name', 'chat_id'], ['users.bot_name', 'users.chat_id'], ondelete='CASCADE',
+            name='messages_bot_name_chat_id_fkey'
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
-    chat_id = Column(BigInteger, ForeignKey('users.chat_id', ondelete='CASCADE'), nullable=False)
+    bot_name = Column(String(100), nullable=False, default='default', server_default='default')
+    chat_id = Column(BigInteger, nullable=False)
     message_id = Column(BigInteger)
     user_id = Column(BigInteger)
     role = Column(String(50), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class PersistenceRecord(Base):
+    __tablename__ = 'persistence'
+    __table_args__ = (UniqueConstraint('bot_name', 'kind', 'key', name='uq_persistence_bot_kind_key'),)
+
+    id = Column(Integer, primary_key=True)
+    bot_name = Column(String(100), nullable=False, default='default', server_default='default')
+    kind = Column(String(100), nullable=False)  # user_data, chat_data, bot_data, conversation:<name>
+    key = Column(String(255), nullable=False)
+    data = Column(JSON, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
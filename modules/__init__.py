@@ -1,5 +1,8 @@
 from .gpt_service import GPTService
 from .student_data_service import StudentDataService
 from .logger import BotLogger
+from .shared_resources import SharedResources
+from .prompt_registry import PromptRegistry, PromptSet
+from .update_processor import PerChatUpdateProcessor
 
-__all__ = ['StudentData', 'GPTService', 'StudentDataService', 'BotLogger']
\ No newline at end of file
+__all__ = ['StudentData', 'GPTService', 'StudentDataService', 'BotLogger', 'SharedResources', 'PromptRegistry', 'PromptSet', 'PerChatUpdateProcessor']
\ No newline at end of file
@@ -1,13 +1,15 @@
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from config.config import BotConfig
 from .logger import BotLogger
 
 class GPTService:
-    def __init__(self, config: BotConfig, logger: BotLogger):
+    def __init__(self, config: BotConfig, logger: BotLogger, session: Optional[requests.Session] = None):
         self.config = config
         self.headers = {'Authorization': f"Bearer {config.gpt_key}"}
         self.logger = logger
+        # HTTP-сессия может быть общей для нескольких ботов в одном процессе
+        self.session = session or requests.Session()
 
     def get_gpt_response(self, messages: List[Dict[str, str]], temperature: float = None) -> str:
         try:
@@ -22,7 +24,7 @@ class GPTService:
             
             self.logger.logger.debug(f"Sending request to GPT proxy: {self.config.openai_proxy_host}")
             
-            response = requests.post(
+            response = self.session.post(
                 url=f'{self.config.openai_proxy_host}get-gpt-answer/',
                 json=data,
                 headers=self.headers,
@@ -5,10 +5,13 @@ from datetime import datetime
 from typing import Optional
 
 class BotLogger:
-    def __init__(self, log_directory: str = "logs"):
+    def __init__(self, log_directory: str = "logs", name: Optional[str] = None):
         self.log_directory = log_directory
         self._setup_directory()
         self.logger = self._configure_logger()
+        # Боты в одном процессе пишут в общие файлы через дочерние логгеры
+        if name:
+            self.logger = self.logger.getChild(name)
 
     def _setup_directory(self) -> None:
         """Создание директории для логов если она не существует"""
@@ -18,6 +21,8 @@ class BotLogger:
     def _configure_logger(self) -> logging.Logger:
         """Настройка логгера с разделением по уровням логирования"""
         logger = logging.getLogger('AumitEduBot')
+        if logger.handlers:
+            return logger
         logger.setLevel(logging.DEBUG)
 
         # Формат логов
@@ -0,0 +1,125 @@
+import codecs
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Tuple
+from .logger import BotLogger
+
+DEFAULT_ROLE = "You are a friendly African student assistant"
+
+# Статусы от лучшего к худшему; у последнего нет нижней границы
+STATUS_LEVELS = ("Superior", "On track", "Small Problems", "Problems", "Critical Gap")
+
+@dataclass(frozen=True)
+class PromptSet:
+    """Неизменяемая версия роли, промптов прогресса и границ статусов"""
+    version: str
+    role: str
+    thresholds: Tuple[Tuple[str, float], ...]
+    progress_prompts: Mapping[str, str]
+
+    def status_for(self, expected_result: float) -> str:
+        """Определение статуса на основе expected_result"""
+        for index, (status, lower_bound) in enumerate(self.thresholds):
+            # Для первого статуса граница строгая, для остальных включительная
+            if (expected_result > lower_bound) if index == 0 else (expected_result >= lower_bound):
+                return status
+        return STATUS_LEVELS[-1]
+
+    def progress_prompt(self, status: str) -> str:
+        """Промпт для статуса студента"""
+        return self.progress_prompts[status]
+
+
+class PromptRegistry:
+    def __init__(self, role_file: str, prompts_file: str, logger: BotLogger):
+        """Реестр промптов: загружает файлы роли и промптов и подменяет версию при их изменении"""
+        self.role_path = os.path.join(os.getcwd(), role_file)
+        self.prompts_path = os.path.join(os.getcwd(), prompts_file)
+        self.logger = logger
+        self._signature = self._file_signature()
+        self._current = self._build(role_fallback=True)
+        self.logger.logger.info(f"Prompts loaded, version {self._current.version}")
+
+    @property
+    def current(self) -> PromptSet:
+        """Текущая версия; обработчик берет ее один раз, чтобы работать с согласованным набором"""
+        return self._current
+
+    @property
+    def version(self) -> str:
+        """Хэш содержимого текущей версии, подходит как ключ для кэшей ответов"""
+        return self._current.version
+
+    def check_for_updates(self) -> bool:
+        """Перезагрузка промптов, если файлы изменились. Возвращает True при смене версии"""
+        signature = self._file_signature()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            prompt_set = self._build()
+        except Exception as e:
+            # Оставляем рабочую версию, пока файл не исправят
+            self.logger.logger.error(f"Error reloading prompts, keeping version {self._current.version}: {str(e)}")
+            return False
+        if prompt_set.version == self._current.version:
+            return False
+        self._current = prompt_set
+        self.logger.logger.info(f"Prompts reloaded, version {prompt_set.version}")
+        return True
+
+    def _file_signature(self) -> tuple:
+        signature = []
+        for path in (self.role_path, self.prompts_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _build(self, role_fallback: bool = False) -> PromptSet:
+        """Чтение файлов и сборка новой версии; ошибки пробрасываются.
+
+        Роль по умолчанию подставляется только при первой загрузке: при перезагрузке
+        (например, файл роли удален и записывается заново) остается прежняя версия.
+        """
+        role = self._load_role(role_fallback)
+        with codecs.open(self.prompts_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+
+        bounds = data["status_thresholds"]
+        prompts = data["progress_prompts"]
+        missing = [status for status in STATUS_LEVELS if status not in prompts]
+        missing += [status for status in STATUS_LEVELS[:-1] if status not in bounds]
+        if missing:
+            raise ValueError(f"Missing statuses in {self.prompts_path}: {', '.join(missing)}")
+        thresholds = tuple((status, float(bounds[status])) for status in STATUS_LEVELS[:-1])
+        if any(upper[1] < lower[1] for upper, lower in zip(thresholds, thresholds[1:])):
+            raise ValueError(f"Status thresholds in {self.prompts_path} must decrease")
+
+        content = json.dumps(
+            {"role": role, "thresholds": thresholds, "prompts": {status: prompts[status] for status in STATUS_LEVELS}},
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return PromptSet(
+            version=hashlib.sha256(content.encode('utf-8')).hexdigest()[:12],
+            role=role,
+            thresholds=thresholds,
+            progress_prompts=MappingProxyType({status: prompts[status] for status in STATUS_LEVELS})
+        )
+
+    def _load_role(self, fallback: bool) -> str:
+        """Загрузка роли бота"""
+        try:
+            with codecs.open(self.role_path, 'r', encoding='utf-8') as file:
+                return file.read().strip()
+        except Exception as e:
+            if not fallback:
+                raise
+            self.logger.logger.error(f"Error loading role: {str(e)}")
+            return DEFAULT_ROLE
@@ -0,0 +1,41 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List
+import requests
+from requests.adapters import HTTPAdapter
+from config.config import BotConfig
+
+def http_pool_size(configs: List[BotConfig]) -> int:
+    """Размер HTTP-пула: лимит запросов к GPT каждого бота плюс поток на обновление данных студентов"""
+    return sum(config.max_concurrent_requests + 1 for config in configs)
+
+class SharedResources:
+    def __init__(self, http_pool_size: int, db_pool_size: int):
+        """Ресурсы, общие для всех ботов процесса: HTTP-сессия и отдельные пулы потоков для HTTP и БД.
+
+        Пулы раздельные, чтобы долгие запросы к GPT не задерживали короткие запросы к БД.
+        http_pool_size рассчитывается из лимитов ботов, db_pool_size равен размеру пула соединений БД.
+        """
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=http_pool_size, pool_maxsize=http_pool_size)
+        self.http_session.mount('https://', adapter)
+        self.http_session.mount('http://', adapter)
+        self.http_executor = ThreadPoolExecutor(max_workers=http_pool_size, thread_name_prefix='http')
+        self.db_executor = ThreadPoolExecutor(max_workers=db_pool_size, thread_name_prefix='db')
+
+    async def run_http(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Выполнение блокирующего HTTP-запроса (GPT, API студентов), не останавливая цикл событий"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.http_executor, functools.partial(func, *args, **kwargs))
+
+    async def run_db(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Выполнение блокирующего запроса к БД, не останавливая цикл событий"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.db_executor, functools.partial(func, *args, **kwargs))
+
+    def close(self) -> None:
+        """Освобождение пулов потоков и HTTP-соединений"""
+        self.http_executor.shutdown(wait=False)
+        self.db_executor.shutdown(wait=False)
+        self.http_session.close()
\ No newline at end of file
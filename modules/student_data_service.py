@@ -1,4 +1,3 @@
-import os
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, Dict
@@ -18,12 +17,14 @@ class StudentProgress:
     created_at: datetime = datetime.now()
 
 class StudentDataService:
-    def __init__(self, logger: BotLogger):
-        """Инициализация сервиса с данными для API"""
-        self.api_url = "https://aumit.us/wp-json/student-progress/v1/course-data/"
-        self.api_key = os.getenv('BOT_TOKEN')
+    def __init__(self, logger: BotLogger, api_url: str, api_key: str,
+                 session: Optional[requests.Session] = None):
+        """Инициализация сервиса с данными для API (адрес и ключ берутся из BotConfig)"""
+        self.api_url = api_url
+        self.api_key = api_key
         self.students_data: Dict[str, StudentProgress] = {}
         self.logger = logger
+        self.session = session or requests.Session()
 
     def update_data(self) -> bool:
         """Обновление данных студентов через API"""
@@ -32,7 +33,7 @@ class StudentDataService:
                 'x-api-key': self.api_key
             }
             
-            response = requests.get(self.api_url, headers=headers)
+            response = self.session.get(self.api_url, headers=headers, timeout=30)
             
             if response.status_code != 200:
                 self.logger.log_api_request(
@@ -49,7 +50,9 @@ class StudentDataService:
             print("\nСырые данные от API:")
             print(json.dumps(data, indent=2))   
             
-            self.students_data.clear()
+            # Собираем новый словарь и подменяем целиком: обновление идет в пуле потоков,
+            # а get_student_progress не должен увидеть частично заполненные данные
+            students_data: Dict[str, StudentProgress] = {}
             
             for record in data:
                 email = record.get("user_email", "").lower()
@@ -64,10 +67,12 @@ class StudentDataService:
                     expected_result=int(record.get("expected_progress_difference", 0))
                 )
                 
-                self.students_data[email] = student
+                students_data[email] = student
                 self.logger.log_student_update(email, student.expected_result)
                 
-                self.logger.logger.info(f"Updated data for {len(self.students_data)} students")
+                self.logger.logger.info(f"Updated data for {len(students_data)} students")
+            
+            self.students_data = students_data
             
             # # Отладочный вывод
             # print(f"\nОбновлены данные для {len(self.students_data)} студентов:")
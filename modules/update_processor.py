@@ -0,0 +1,43 @@
+import asyncio
+from typing import Any, Awaitable, Dict
+from telegram.ext import BaseUpdateProcessor
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Параллельная обработка обновлений разных чатов; обновления одного чата идут по очереди.
+
+    ConversationHandler сохраняет состояние чата только после завершения обработчика,
+    поэтому следующее сообщение того же чата должно ждать окончания предыдущего.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._waiting: Dict[int, int] = {}
+
+    async def process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        chat = getattr(update, 'effective_chat', None)
+        if chat is None:
+            await super().process_update(update, coroutine)
+            return
+
+        # Блокировка чата берется до общего лимита, чтобы очередь одного чата не занимала слоты других
+        chat_id = chat.id
+        lock = self._locks.setdefault(chat_id, asyncio.Lock())
+        self._waiting[chat_id] = self._waiting.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                await super().process_update(update, coroutine)
+        finally:
+            self._waiting[chat_id] -= 1
+            if not self._waiting[chat_id]:
+                del self._waiting[chat_id]
+                del self._locks[chat_id]
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        await coroutine
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
\ No newline at end of file
@@ -0,0 +1,82 @@
+import asyncio
+import datetime
+import os
+import signal
+from typing import List
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from config.config import BotConfig, load_bot_configs
+from modules.logger import BotLogger
+from modules.shared_resources import SharedResources, http_pool_size
+from models.database import DB_POOL_SIZE, DB_MAX_OVERFLOW
+from bot import TelegramBot
+
+class BotHost:
+    def __init__(self, configs: List[BotConfig]):
+        """Несколько ботов в одном процессе с общими пулами БД, HTTP и планировщиком"""
+        self.logger = BotLogger(configs[0].log_directory)
+        # HTTP-пул вмещает лимиты всех ботов, поэтому занятый бот не отнимает потоки у других
+        self.shared = SharedResources(
+            http_pool_size=http_pool_size(configs),
+            db_pool_size=DB_POOL_SIZE + DB_MAX_OVERFLOW
+        )
+        self.scheduler = AsyncIOScheduler()
+        self.bots = [TelegramBot(config, shared=self.shared) for config in configs]
+        self.logger.logger.info(f"Bot host initialized with {len(self.bots)} bots")
+
+    async def run(self):
+        """Запуск всех ботов до получения сигнала остановки"""
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop_event.set)
+
+        started = []
+        try:
+            for bot in self.bots:
+                await bot.application.initialize()
+                await bot.application.start()
+                await bot.application.updater.start_polling(poll_interval=1.0)
+                started.append(bot)
+                self.logger.logger.info(f"Bot '{bot.config.name}' started")
+
+            # Обновление данных студентов и проверка промптов для всех ботов через общий планировщик
+            first_run = datetime.datetime.now() + datetime.timedelta(seconds=10)
+            for bot in self.bots:
+                self.scheduler.add_job(
+                    bot.periodic_update,
+                    'interval',
+                    minutes=bot.config.update_interval,
+                    args=[None],
+                    id=f"periodic_update_{bot.config.name}",
+                    next_run_time=first_run
+                )
+                self.scheduler.add_job(
+                    bot.reload_prompts,
+                    'interval',
+                    seconds=bot.config.prompt_reload_interval,
+                    args=[None],
+                    id=f"reload_prompts_{bot.config.name}"
+                )
+            self.scheduler.start()
+
+            print(f'Запущено ботов: {len(self.bots)}')
+            await stop_event.wait()
+        finally:
+            if self.scheduler.running:
+                self.scheduler.shutdown(wait=False)
+            for bot in reversed(started):
+                try:
+                    if bot.application.updater.running:
+                        await bot.application.updater.stop()
+                    await bot.application.stop()
+                    await bot.application.shutdown()
+                except Exception as e:
+                    self.logger.logger.error(f"Error stopping bot '{bot.config.name}': {str(e)}", exc_info=True)
+            self.shared.close()
+            self.logger.logger.info("Bot host stopped")
+
+
+if __name__ == '__main__':
+    configs = load_bot_configs(os.getenv('BOTS_CONFIG', 'bots.json'))
+    host = BotHost(configs)
+    asyncio.run(host.run())
@@ -1,3 +1,4 @@
 from .database_service import DatabaseService
+from .persistence_service import DatabasePersistence
 
-__all__ = ['DatabaseService']
\ No newline at end of file
+__all__ = ['DatabaseService', 'DatabasePersistence']
\ No newline at end of file
@@ -0,0 +1,238 @@
+import asyncio
+import json
+from copy import deepcopy
+from typing import Any, Dict, Optional, Tuple
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+from models.models import PersistenceRecord
+from models.database import SessionLocal
+from modules.logger import BotLogger
+
+USER_DATA = 'user_data'
+CHAT_DATA = 'chat_data'
+BOT_DATA = 'bot_data'
+CONVERSATION_PREFIX = 'conversation:'
+MAX_RETRY_DELAY = 60  # секунд между повторными попытками записи
+
+
+class DatabasePersistence(BasePersistence[Dict[Any, Any], Dict[Any, Any], Dict[Any, Any]]):
+    """Хранение состояний диалогов, user_data и chat_data в базе данных.
+
+    Изменения копятся в памяти и записываются одной транзакцией на пачку,
+    а не отдельным запросом на каждое обновление. Данные каждого типа
+    читаются из базы только при первом запросе от Application.
+    Все значения должны сериализоваться в JSON: значения, которые не удается
+    сериализовать, не сохраняются (ошибка пишется в лог), а числовые ключи
+    вложенных словарей после перезапуска возвращаются строками.
+    """
+
+    def __init__(self, logger: BotLogger, update_interval: float = 60, bot_name: str = 'default'):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=True, chat_data=True, user_data=True, callback_data=False),
+            update_interval=update_interval
+        )
+        self.logger = logger
+        self.bot_name = bot_name
+        self._user_data: Optional[Dict[int, Dict[Any, Any]]] = None
+        self._chat_data: Optional[Dict[int, Dict[Any, Any]]] = None
+        self._bot_data: Optional[Dict[Any, Any]] = None
+        self._conversations: Dict[str, Dict[Tuple[int, ...], object]] = {}
+        # Несохраненные изменения: (kind, key) -> данные, None означает удаление
+        self._pending: Dict[Tuple[str, str], Any] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Будит ожидающую повторной попытки запись при остановке бота
+        self._wake = asyncio.Event()
+        self._closing = False
+
+    # Чтение
+
+    async def get_user_data(self) -> Dict[int, Dict[Any, Any]]:
+        if self._user_data is None:
+            records = await self._load(USER_DATA)
+            self._user_data = {int(key): data for key, data in records.items()}
+        return deepcopy(self._user_data)
+
+    async def get_chat_data(self) -> Dict[int, Dict[Any, Any]]:
+        if self._chat_data is None:
+            records = await self._load(CHAT_DATA)
+            self._chat_data = {int(key): data for key, data in records.items()}
+        return deepcopy(self._chat_data)
+
+    async def get_bot_data(self) -> Dict[Any, Any]:
+        if self._bot_data is None:
+            records = await self._load(BOT_DATA)
+            self._bot_data = records.get('', {})
+        return deepcopy(self._bot_data)
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def get_conversations(self, name: str) -> Dict[Tuple[int, ...], object]:
+        if name not in self._conversations:
+            records = await self._load(CONVERSATION_PREFIX + name)
+            self._conversations[name] = {
+                tuple(json.loads(key)): state for key, state in records.items()
+            }
+        return self._conversations[name].copy()
+
+    # Запись
+
+    async def update_conversation(self, name: str, key: Tuple[int, ...], new_state: Optional[object]) -> None:
+        conversations = self._conversations.setdefault(name, {})
+        if conversations.get(key) == new_state:
+            return
+        if new_state is None:
+            conversations.pop(key, None)
+        else:
+            conversations[key] = new_state
+        self._schedule(CONVERSATION_PREFIX + name, json.dumps(list(key)), new_state)
+
+    async def update_user_data(self, user_id: int, data: Dict[Any, Any]) -> None:
+        if self._user_data is None:
+            self._user_data = {}
+        if self._user_data.get(user_id, {}) == data:
+            return
+        self._user_data[user_id] = deepcopy(data)
+        self._schedule(USER_DATA, str(user_id), deepcopy(data))
+
+    async def update_chat_data(self, chat_id: int, data: Dict[Any, Any]) -> None:
+        if self._chat_data is None:
+            self._chat_data = {}
+        if self._chat_data.get(chat_id, {}) == data:
+            return
+        self._chat_data[chat_id] = deepcopy(data)
+        self._schedule(CHAT_DATA, str(chat_id), deepcopy(data))
+
+    async def update_bot_data(self, data: Dict[Any, Any]) -> None:
+        if (self._bot_data or {}) == data:
+            return
+        self._bot_data = deepcopy(data)
+        self._schedule(BOT_DATA, '', deepcopy(data))
+
+    async def update_callback_data(self, data: Any) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        if self._chat_data is not None:
+            self._chat_data.pop(chat_id, None)
+        self._schedule(CHAT_DATA, str(chat_id), None)
+
+    async def drop_user_data(self, user_id: int) -> None:
+        if self._user_data is not None:
+            self._user_data.pop(user_id, None)
+        self._schedule(USER_DATA, str(user_id), None)
+
+    # Данные живут в памяти процесса, перечитывать их из базы не нужно
+    async def refresh_user_data(self, user_id: int, user_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: Dict[Any, Any]) -> None:
+        pass
+
+    async def flush(self) -> None:
+        """Запись всех накопленных изменений при остановке бота"""
+        self._closing = True
+        self._wake.set()
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        if self._pending:
+            batch, self._pending = self._pending, {}
+            await asyncio.to_thread(self._write_batch, batch)
+            self.logger.logger.info(f"Persistence flushed {len(batch)} records on shutdown")
+
+    # Работа с базой данных
+
+    def _schedule(self, kind: str, key: str, data: Any) -> None:
+        """Постановка изменения в очередь; повторные изменения одного ключа схлопываются"""
+        # Одно несериализуемое значение не должно блокировать запись всей пачки
+        try:
+            json.dumps(data)
+        except (TypeError, ValueError) as e:
+            self.logger.logger.error(f"Persistence skipped {kind} '{key}': value is not JSON-serializable ({str(e)})")
+            return
+        self._pending[(kind, key)] = data
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_pending())
+
+    async def _flush_pending(self) -> None:
+        # Даем остальным update_* из текущего цикла update_persistence попасть в пачку
+        await asyncio.sleep(0)
+        retry_delay = 1
+        while self._pending:
+            batch, self._pending = self._pending, {}
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                self.logger.logger.debug(f"Persistence batch written: {len(batch)} records")
+                retry_delay = 1
+            except Exception as e:
+                self.logger.logger.error(
+                    f"Error writing persistence batch, retrying in {retry_delay}s: {str(e)}", exc_info=True
+                )
+                # Возвращаем изменения в очередь, не затирая более свежие
+                for item_key, data in batch.items():
+                    self._pending.setdefault(item_key, data)
+                if self._closing:
+                    # Последнюю попытку делает flush()
+                    return
+                # Повторяем, даже если новых изменений не будет; flush() прерывает ожидание
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=retry_delay)
+                except asyncio.TimeoutError:
+                    pass
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+
+    async def _load(self, kind: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._read_kind, kind)
+
+    def _read_kind(self, kind: str) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            records = db.query(PersistenceRecord).filter(
+                PersistenceRecord.bot_name == self.bot_name,
+                PersistenceRecord.kind == kind
+            ).all()
+            self.logger.logger.info(f"Loaded {len(records)} persistence records of kind '{kind}'")
+            return {record.key: record.data for record in records}
+        finally:
+            db.close()
+
+    def _write_batch(self, batch: Dict[Tuple[str, str], Any]) -> None:
+        """Запись пачки изменений одной транзакцией"""
+        keys_by_kind: Dict[str, list] = {}
+        for kind, key in batch:
+            keys_by_kind.setdefault(kind, []).append(key)
+
+        db = SessionLocal()
+        try:
+            for kind, keys in keys_by_kind.items():
+                existing = {
+                    record.key: record
+                    for record in db.query(PersistenceRecord)
+                        .filter(
+                            PersistenceRecord.bot_name == self.bot_name,
+                            PersistenceRecord.kind == kind,
+                            PersistenceRecord.key.in_(keys)
+                        )
+                        .all()
+                }
+                for key in keys:
+                    data = batch[(kind, key)]
+                    record = existing.get(key)
+                    if data is None:
+                        if record is not None:
+                            db.delete(record)
+                    elif record is None:
+                        db.add(PersistenceRecord(bot_name=self.bot_name, kind=kind, key=key, data=data))
+                    else:
+                        record.data = data
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()